@@ -18,6 +18,19 @@ METADATA_FILE_PATH = r"C:\Users\OCELOU\Desktop\UF_DSE_DRIVE\UF_datasets\PYTHON\C
 INSCRIPTION_FILE_PATH = r"C:\Users\OCELOU\Desktop\UF_DSE_DRIVE\UF_datasets\POWERQUERY\_UFALLTIME__KEYED.xlsx"
 # ----------------------------------------
 
+# --- Lecture des fichiers Excel ---
+# Moteur pandas.read_excel : 'calamine' (parseur Rust, nécessite `pip install python-calamine`)
+# Remettre 'openpyxl' si python-calamine n'est pas disponible.
+# Le fichier d'inscriptions est lu ligne à ligne : itérateur calamine, ou openpyxl en lecture
+# seule pour tout autre moteur (et si python-calamine n'est pas installé).
+EXCEL_ENGINE = "calamine"
+
+# Cache Parquet : chaque fichier Excel lu est recopié en '<fichier>.xlsx.<clé>.parquet' (nécessite pyarrow)
+# et c'est cette copie qui est relue tant que le fichier Excel n'a pas été modifié.
+# La clé dépend de EXCEL_ENGINE et des types demandés : les modifier recrée le cache.
+EXCEL_PARQUET_CACHE = True
+# ----------------------------------------
+
 # --- URLs de Connexion (avec correction d'encodage) ---
 # Ajout de client_encoding=windows-1252 dans la Query String pour la robustesse
 
@@ -27,4 +40,7 @@ DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{
 # URL pour la BDD par défaut (utile pour la création de la BDD cible)
 DEFAULT_DB_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/postgres?client_encoding=utf8"
 
+# Affiche les requêtes SQL émises (ex: vérifier qu'un INSERT multi-lignes part en une seule requête)
+SQL_ECHO = False
+
 #scolarité
\ No newline at end of file
@@ -12,7 +12,20 @@ from models import Base
 
 # Moteur pour la BDD cible
 try:
-    engine = create_engine(config.DATABASE_URL) 
+    # Mode executemany rapide de psycopg2 : les INSERT multi-lignes sont regroupés
+    # en VALUES (...), (...) et les UPDATE/DELETE en lots (execute_batch).
+    # Pool de connexions : les connexions restent ouvertes entre les phases d'import
+    # (et entre les threads des métadonnées), pool_pre_ping écarte celles devenues invalides.
+    engine = create_engine(
+        config.DATABASE_URL,
+        executemany_mode='values_plus_batch',
+        insertmanyvalues_page_size=1000,
+        executemany_batch_page_size=500,
+        pool_pre_ping=True,
+        pool_size=5,
+        max_overflow=10,
+        echo=config.SQL_ECHO
+    ) 
     # Moteur pour la BDD par défaut (pour la création)
     default_engine = create_engine(config.DEFAULT_DB_URL) 
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -1,12 +1,40 @@
 # import_data.py
 
 import pandas as pd
+import atexit
+import hashlib
+import io
+import os
+import queue
 import sys
 import logging
+from logging.handlers import QueueHandler, QueueListener
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain, islice
 from tqdm import tqdm
+from sqlalchemy import String, literal, text
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError, DataError
-from datetime import date 
+from sqlalchemy.exc import IntegrityError, DataError, SQLAlchemyError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+try:
+    import pyarrow  # noqa: F401
+    # Colonnes texte stockées en Arrow : les opérations .str s'exécutent en C, sans boucle Python
+    STRING_DTYPE = 'string[pyarrow]'
+except ImportError:
+    STRING_DTYPE = None
+
+# polars (avec fastexcel et pyarrow) est facultatif : sans lui, les fichiers Excel sont lus par pandas
+pl = None
+if STRING_DTYPE is not None:  # DataFrame.to_pandas() de polars a besoin de pyarrow
+    try:
+        import polars as pl
+        # pl.read_excel(engine='calamine') s'appuie sur fastexcel
+        import fastexcel  # noqa: F401
+    except ImportError:
+        pl = None
 
 import config
 import database_setup
@@ -15,24 +43,199 @@ from models import (
     AnneeUniversitaire, Etudiant, Inscription
 )
 
-# Configuration du logging (inchangée)
-logging.basicConfig(filename='import_errors.log', 
-                    filemode='w', 
-                    encoding='utf-8',
-                    level=logging.ERROR,
-                    format='%(asctime)s - %(levelname)s - %(message)s')
+# Configuration du logging : les erreurs sont mises en file (QueueHandler) et écrites dans
+# 'import_errors.log' par un thread dédié (QueueListener), sans bloquer la boucle d'import.
+_log_queue = queue.Queue(-1)
+_log_file_handler = logging.FileHandler('import_errors.log', mode='w', encoding='utf-8')
+_log_file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+_log_listener = QueueListener(_log_queue, _log_file_handler)
+logging.getLogger().addHandler(QueueHandler(_log_queue))
+logging.getLogger().setLevel(logging.ERROR)
+_log_listener.start()
+# Vide la file et ferme le fichier à la fin du programme
+atexit.register(_log_listener.stop)
+
+# Nombre de lignes par transaction pour les imports Étudiants/Inscriptions
+COMMIT_BATCH_SIZE = 500
+
+# Nombre maximal de paramètres liés par requête INSERT multi-lignes (limite du protocole PostgreSQL)
+MAX_BIND_PARAMS = 65535
+
+# Nombre de threads (donc de connexions simultanées du pool) pour l'import des métadonnées
+METADATA_WORKERS = 2
+
+# Nombre de lignes du fichier d'inscriptions lues et importées à la fois (borne la mémoire)
+INSCRIPTION_CHUNK_SIZE = 20000
+
+
+@lru_cache(maxsize=8192)
+def _safe_string_cached(s: str) -> str:
+    """Nettoyage d'une chaîne, mis en cache : une valeur répétée (sexe, niveau, année...) n'est traitée qu'une fois."""
+    # Un str Python est déjà de l'Unicode valide : un aller-retour encode/decode UTF-8 ne change rien
+    return s.strip()
 
 
 def safe_string(s):
     """
     Conserve les caractères spéciaux et accents (UTF-8) tout en gérant les espaces (strip).
+    Les valeurs non textuelles (None, NA, nombres...) sont renvoyées telles quelles, hors du cache.
     """
-    if s is None or not isinstance(s, str):
-        return s
+    return _safe_string_cached(s) if isinstance(s, str) else s
+
+
+def clean_str_cols(df: pd.DataFrame, cols: list) -> pd.DataFrame:
+    """Équivalent vectorisé de safe_string (strip), une fois par colonne (Arrow si pyarrow, sinon factorize).
+    Les colonnes passent en dtype 'string' (manquants = pd.NA) ; les colonnes absentes sont ignorées."""
+    for col in [c for c in cols if c in df.columns]:
+        if STRING_DTYPE is not None:
+            serie = df[col] if df[col].dtype == STRING_DTYPE else df[col].astype(STRING_DTYPE)
+            df[col] = serie.str.strip()
+            continue
+        
+        # Colonnes déjà lues en 'string' (dtype de _read_excel) : pas de conversion supplémentaire
+        serie = df[col] if isinstance(df[col].dtype, pd.StringDtype) else df[col].astype('string')
+        codes, valeurs = pd.factorize(serie)
+        nettoyees = pd.array([safe_string(v) for v in valeurs], dtype='string')
+        df[col] = pd.Series(nettoyees.take(codes, allow_fill=True), index=df.index)
+    return df
+
+
+def _normalize_header(entete) -> str:
+    """Nom de colonne normalisé : minuscules, espaces remplacés par '_' (ex: 'Institution ID' -> 'institution_id')."""
+    return str(entete).lower().replace(' ', '_')
+
+
+def _read_excel(path: str, dtype: dict = None) -> pd.DataFrame:
+    """Lit la première feuille d'un Excel (polars si disponible, sinon pandas), en-têtes normalisés.
+    dtype fixe le type des colonnes par nom normalisé ; les clés absentes du fichier sont ignorées."""
+    # Le moteur et les types demandés font partie de la clé : les changer ne relit pas un ancien cache
+    cle = hashlib.md5(repr((config.EXCEL_ENGINE, sorted((dtype or {}).items()))).encode()).hexdigest()[:8]
+    cache = f"{path}.{cle}.parquet"
+    if config.EXCEL_PARQUET_CACHE and os.path.exists(cache) and os.path.getmtime(cache) > os.path.getmtime(path):
+        print(f"Lecture du cache Parquet '{cache}'.")
+        df = pd.read_parquet(cache)
+        df.columns = [_normalize_header(c) for c in df.columns]
+        return df
     
-    s = s.strip()
+    # Une seule lecture ; les types sont appliqués ensuite, sur les noms normalisés
+    if pl is not None and config.EXCEL_ENGINE == 'calamine':
+        df = pl.read_excel(path, engine='calamine').to_pandas()
+    else:
+        df = pd.read_excel(path, engine=config.EXCEL_ENGINE)
+    df.columns = [_normalize_header(c) for c in df.columns]
+    for col, type_col in (dtype or {}).items():
+        if col not in df.columns:
+            continue
+        # Clé numérique avec cellules vides (lue en flottant) : 1000.0 -> 1000 avant le texte, comme _excel_cell
+        if pd.api.types.is_float_dtype(df[col]) and (df[col].dropna() % 1 == 0).all():
+            df[col] = df[col].astype('Int64')
+        df[col] = df[col].astype(type_col)
     
-    return s.encode('utf-8', errors='ignore').decode('utf-8')
+    # Colonnes de types mixtes (ex: 101 et 'L-INFO') en texte : Arrow refuse de les écrire telles quelles,
+    # et la lecture depuis le cache rend alors le même DataFrame que la lecture de l'Excel
+    df = df.astype({col: 'string' for col in df.select_dtypes(include='object').columns})
+    
+    if config.EXCEL_PARQUET_CACHE:
+        try:
+            df.to_parquet(cache, compression='zstd')
+        except Exception as e:
+            # Cache facultatif (pyarrow absent, dossier en lecture seule...) : l'import continue
+            print(f"⚠️ Cache Parquet non écrit pour '{path}'. {e}", file=sys.stderr)
+    return df
+
+
+def _to_records(df: pd.DataFrame) -> list:
+    """Convertit un DataFrame en liste de dicts (NaN/NA -> None pour psycopg2)."""
+    return df.astype(object).where(df.notna(), None).to_dict(orient='records')
+
+
+def _iter_rows(df: pd.DataFrame, colonnes: list):
+    """
+    Itère sur (index, dict) pour les colonnes demandées, à partir des records déjà
+    matérialisés une fois par _to_records (pas de Series par ligne comme iterrows).
+    Colonnes absentes et valeurs manquantes -> None.
+    """
+    df_rows = df.reindex(columns=colonnes)
+    return zip(df_rows.index, _to_records(df_rows))
+
+
+def _bulk_upsert(session: Session, model, records: list, index_elements: list, detecter_table_vide: bool = True):
+    """INSERT ... ON CONFLICT DO UPDATE multi-lignes, par lots sous MAX_BIND_PARAMS paramètres.
+    Table vide (vérifiée une fois si detecter_table_vide) : mêmes INSERT, sans clause ON CONFLICT."""
+    if not records:
+        return
+
+    # Table vide : aucun conflit possible (les records sont déjà dédoublonnés par clé)
+    sans_conflit = detecter_table_vide and _table_is_empty(session, model)
+
+    lignes = iter(records)
+    taille_lot = max(1, MAX_BIND_PARAMS // len(records[0]))
+    while lot := list(islice(lignes, taille_lot)):
+        stmt = pg_insert(model.__table__).values(lot)
+        if not sans_conflit:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=index_elements,
+                set_={col: stmt.excluded[col] for col in lot[0] if col not in index_elements}
+            )
+        session.execute(stmt)
+
+
+def _varchar_limits(model) -> dict:
+    """Taille maximale de chaque colonne VARCHAR du modèle (ex: {'bacc_serie': 50, 'sexe': 20, ...})."""
+    return {
+        c.name: c.type.length for c in model.__table__.columns
+        if isinstance(c.type, String) and c.type.length
+    }
+
+
+def _reject_too_long(df: pd.DataFrame, model, key: str, label: str):
+    """
+    Écarte les lignes dont une valeur dépasse la taille de sa colonne VARCHAR et les journalise.
+    Contrôle vectorisé côté client : la base ne reçoit jamais ces lignes.
+    Retourne le DataFrame filtré et le nombre de lignes rejetées.
+    """
+    trop_longues = pd.Series(False, index=df.index)
+    for col, limite in _varchar_limits(model).items():
+        if col not in df.columns:
+            continue
+        masque = (df[col].str.len() > limite).fillna(False).astype(bool)
+        for idx in df.index[masque]:
+            cle = df.at[idx, key]
+            print(f"❌ [{label}] Ligne Excel {idx} ({cle}) - ERREUR: Valeur trop longue (TRONCATION sur VARCHAR({limite}) - ({col}))")
+            logging.error(f"{label}: {cle} | ERREUR TRONCATION sur VARCHAR({limite}) - ({col}) | LIGNE_EXCEL_IDX: {idx}")
+        trop_longues |= masque
+    return df[~trop_longues], int(trop_longues.sum())
+
+
+def _existing_keys(session: Session, colonne, valeurs) -> set:
+    """Sous-ensemble des valeurs déjà présentes en base pour la colonne (clé) donnée, en une requête."""
+    return {k for (k,) in session.query(colonne).filter(colonne.in_(list(valeurs)))}
+
+
+def _unique_rows_mask(cle: pd.Series, keep='first') -> pd.Series:
+    """Masque des lignes à conserver : clé non nulle, une seule occurrence par clé."""
+    return cle.notna() & ~cle.duplicated(keep=keep)
+
+
+def _table_is_empty(session: Session, model) -> bool:
+    """Vrai si la table du modèle ne contient encore aucune ligne (SELECT 1 ... LIMIT 1)."""
+    return session.query(literal(1)).select_from(model.__table__).limit(1).first() is None
+
+
+def _upsert_in_batches(session: Session, model, df: pd.DataFrame, index_elements: list, reprise_ligne_par_ligne, erreurs, desc: str):
+    """INSERT ... ON CONFLICT par lots de COMMIT_BATCH_SIZE lignes ; un lot en échec passe par reprise_ligne_par_ligne.
+    Retourne 'erreurs' (int ou Counter) augmenté des erreurs de ces reprises."""
+    colonnes = [c.name for c in model.__table__.columns]
+    for debut in tqdm(range(0, len(df), COMMIT_BATCH_SIZE), desc=desc):
+        df_lot = df.iloc[debut:debut + COMMIT_BATCH_SIZE]
+        try:
+            # Reprise après échec : pas de SELECT de détection de table vide à chaque lot
+            _bulk_upsert(session, model, _to_records(df_lot.reindex(columns=colonnes)), index_elements, detecter_table_vide=False)
+            session.commit()
+        except SQLAlchemyError:
+            session.rollback()
+            erreurs += reprise_ligne_par_ligne(session, df_lot)
+    return erreurs
 
 
 # ----------------------------------------------------------------------
@@ -43,22 +246,21 @@ def _import_institutions(session: Session) -> bool:
     """Charge et importe la table Institution."""
     print("\n--- Importation des Institutions ---")
     try:
-        df_inst = pd.read_excel(config.INSTITUTION_FILE_PATH)
-        df_inst.columns = df_inst.columns.str.lower().str.replace(' ', '_')
-        df_inst = df_inst.where(pd.notnull(df_inst), None)
+        df_inst = _read_excel(config.INSTITUTION_FILE_PATH, dtype={'institution_id': 'string'})
         
-        df_inst['institution_id'] = df_inst['institution_id'].astype(str).apply(safe_string)
-        df_inst_clean = df_inst.drop_duplicates(subset=['institution_id']).dropna(subset=['institution_id'])
+        clean_str_cols(df_inst, ['institution_id', 'institution_nom', 'institution_type'])
+        df_inst_clean = df_inst.loc[
+            _unique_rows_mask(df_inst['institution_id']), ['institution_id', 'institution_nom', 'institution_type']
+        ].rename(columns={
+            'institution_id': 'id_institution',
+            'institution_nom': 'nom',
+            'institution_type': 'type_institution'
+        })
         
-        for _, row in tqdm(df_inst_clean.iterrows(), total=len(df_inst_clean), desc="Institutions"):
-            session.merge(Institution(
-                id_institution=row['institution_id'], 
-                nom=safe_string(row['institution_nom']),
-                type_institution=safe_string(row['institution_type'])
-            ))
+        _bulk_upsert(session, Institution, _to_records(df_inst_clean), ['id_institution'])
         
-        session.commit()
-        print("✅ Importation des Institutions terminée.")
+        # Validation unique par _run_in_session
+        print(f"✅ Importation des Institutions terminée. {len(df_inst_clean)} ligne(s).")
         return True
         
     except Exception as e:
@@ -70,88 +272,85 @@ def _import_institutions(session: Session) -> bool:
 def _import_composantes(session: Session, df: pd.DataFrame):
     """Importe les Composantes (dépend d'Institution)."""
     print("\n--- Importation des Composantes ---")
-    df_composantes = df[['composante', 'label_composante', 'institution_id']].drop_duplicates(subset=['composante']).dropna(subset=['composante'])
+    df_composantes = df.loc[_unique_rows_mask(df['composante']), ['composante', 'label_composante', 'institution_id']]
+    
+    df_composantes = df_composantes.rename(columns={
+        'composante': 'code',
+        'label_composante': 'label',
+        'institution_id': 'id_institution' # Clé Étrangère
+    })
     
-    for _, row in tqdm(df_composantes.iterrows(), total=len(df_composantes), desc="Composantes"):
-        session.merge(Composante(
-            code=row['composante'], 
-            label=safe_string(row['label_composante']),
-            id_institution=row['institution_id'] # Clé Étrangère
-        ))
+    _bulk_upsert(session, Composante, _to_records(df_composantes), ['code'])
+    print(f"{len(df_composantes)} composante(s) insérée(s)/mise(s) à jour.")
 
 
 def _import_domaines(session: Session, df: pd.DataFrame):
     """Importe les Domaines."""
     print("\n--- Importation des Domaines ---")
-    df_domaines = df[['domaine', 'label_domaine']].drop_duplicates(subset=['domaine']).dropna(subset=['domaine'])
+    df_domaines = df.loc[_unique_rows_mask(df['domaine']), ['domaine', 'label_domaine']]
     
-    for _, row in tqdm(df_domaines.iterrows(), total=len(df_domaines), desc="Domaines"):
-        session.merge(Domaine(code=row['domaine'], label=safe_string(row['label_domaine'])))
+    df_domaines = df_domaines.rename(columns={'domaine': 'code', 'label_domaine': 'label'})
+    
+    _bulk_upsert(session, Domaine, _to_records(df_domaines), ['code'])
+    print(f"{len(df_domaines)} domaine(s) inséré(s)/mis à jour.")
 
 
 def _import_mentions(session: Session, df: pd.DataFrame):
     """Importe les Mentions (dépend de Composante et Domaine)."""
     print("\n--- Importation des Mentions ---")
-    df_mentions_source = df[['mention', 'label_mention', 'id_mention', 'composante', 'domaine']].drop_duplicates(subset=['id_mention']).dropna(subset=['id_mention'])
+    df_mentions = df.loc[_unique_rows_mask(df['id_mention']), ['mention', 'label_mention', 'id_mention', 'composante', 'domaine']].rename(columns={
+        'mention': 'code_mention',
+        'label_mention': 'label',
+        'composante': 'composante_code',
+        'domaine': 'domaine_code'
+    })
     
-    for _, row in tqdm(df_mentions_source.iterrows(), total=len(df_mentions_source), desc="Mentions"):
-        session.merge(Mention(
-            id_mention=row['id_mention'],           
-            code_mention=safe_string(row['mention']),
-            label=safe_string(row['label_mention']),
-            composante_code=row['composante'], 
-            domaine_code=row['domaine']
-        ))
-    return df_mentions_source # Retourne le DF source pour la jointure des Parcours
+    _bulk_upsert(session, Mention, _to_records(df_mentions), ['id_mention'])
+    print(f"{len(df_mentions)} mention(s) insérée(s)/mise(s) à jour.")
 
 
-def _import_parcours(session: Session, df: pd.DataFrame, df_mentions_source: pd.DataFrame):
+def _import_parcours(session: Session, df: pd.DataFrame):
     """Importe les Parcours (dépend de Mention), en utilisant id_mention directement."""
     print("\n--- Importation des Parcours ---")
     
     # 1. Préparation des Parcours - UTILISER ID_MENTION DIRECTEMENT DU DF PRINCIPAL (si elle y est)
-    # Nous assumons que df contient la colonne 'id_mention' nettoyée
-    df_parcours = df[['id_parcours', 'parcours', 'label_parcours', 'id_mention', 'date_creation', 'date_fin']].copy()
-    
-    # Remplacer df_parcours_merged par df_parcours
-    df_parcours = df_parcours.drop_duplicates(subset=['id_parcours'], keep='first').dropna(subset=['id_parcours', 'id_mention'])
-
-    nombre_parcours_uniques = len(df_parcours)
-    
-    # La variable row['id_mention'] est désormais directement disponible
-    for _, row in tqdm(df_parcours.iterrows(), total=nombre_parcours_uniques, desc="Parcours"):
-        
-        # Gestion sécurisée des dates
-        date_creation_val = int(row['date_creation']) if pd.notna(row['date_creation']) and row['date_creation'] is not None else None
-        date_fin_val = int(row['date_fin']) if pd.notna(row['date_fin']) and row['date_fin'] is not None else None
-        
-        session.merge(Parcours(
-            id_parcours=row['id_parcours'], 
-            code_parcours=safe_string(row['parcours']), 
-            label=safe_string(row['label_parcours']),
+    # Nous assumons que df contient la colonne 'id_mention' nettoyée.
+    # Chaîne sans .copy() ni modification en place : chaque étape ne produit qu'un seul nouveau DF.
+    df_parcours = (
+        df.loc[_unique_rows_mask(df['id_parcours']), ['id_parcours', 'parcours', 'label_parcours', 'id_mention', 'date_creation', 'date_fin']]
+        .dropna(subset=['id_mention'])
+        .rename(columns={
+            'parcours': 'code_parcours',
+            'label_parcours': 'label',
             # Utilisation de l'ID correct récupéré du fichier source
-            mention_id=row['id_mention'], 
-            date_creation=date_creation_val,
-            date_fin=date_fin_val
-        ))
+            'id_mention': 'mention_id'
+        })
+        # Gestion sécurisée des dates (entiers nullables, NA -> None dans _to_records)
+        .assign(
+            date_creation=lambda d: pd.to_numeric(d['date_creation'], errors='coerce').astype('Int64'),
+            date_fin=lambda d: pd.to_numeric(d['date_fin'], errors='coerce').astype('Int64')
+        )
+    )
     
-    # Retirer le paramètre df_mentions_source si cette solution est adoptée dans l'orchestrateur.
+    _bulk_upsert(session, Parcours, _to_records(df_parcours), ['id_parcours'])
+    print(f"{len(df_parcours)} parcours inséré(s)/mis à jour.")
 
 
 def _load_and_clean_metadata():
     """Charge et nettoie le fichier de métadonnées académiques."""
     try:
-        df = pd.read_excel(config.METADATA_FILE_PATH)
-        df.columns = df.columns.str.lower().str.replace(' ', '_')
-        df = df.where(pd.notnull(df), None)
+        df = _read_excel(config.METADATA_FILE_PATH, dtype={
+            'institution_id': 'string', 'composante': 'string', 'domaine': 'string',
+            'id_mention': 'string', 'id_parcours': 'string'
+        })
+        # NaN/NA -> None uniquement à la frontière psycopg2 (_to_records) : pas de copie complète du DF ici
         print(f"Fichier de métadonnées académiques chargé. {len(df)} lignes trouvées.")
         
-        # --- Nettoyage initial et obligatoire des clés critiques ---
-        df['institution_id'] = df['institution_id'].astype(str).apply(safe_string) 
-        df['composante'] = df['composante'].astype(str).apply(safe_string)
-        df['domaine'] = df['domaine'].astype(str).apply(safe_string)
-        df['id_mention'] = df['id_mention'].astype(str).apply(safe_string) 
-        df['id_parcours'] = df['id_parcours'].astype(str).apply(safe_string)
+        # --- Nettoyage initial et obligatoire des clés critiques et des libellés (une passe par colonne) ---
+        clean_str_cols(df, [
+            'institution_id', 'composante', 'domaine', 'id_mention', 'id_parcours',
+            'label_composante', 'label_domaine', 'mention', 'label_mention', 'parcours', 'label_parcours'
+        ])
         
         return df
         
@@ -163,226 +362,445 @@ def _load_and_clean_metadata():
 # FONCTION ORCHESTRATRICE DE LA STRUCTURE ACADÉMIQUE
 # ----------------------------------------------------------------------
 
-def import_metadata_to_db():
+def _import_mentions_and_parcours(session: Session, df: pd.DataFrame):
+    """Importe les Mentions (dépend de Composante/Domaine) puis les Parcours (dépend de Mention), sans commit intermédiaire."""
+    _import_mentions(session, df)
+    _import_parcours(session, df)
+
+
+def _run_in_session(import_func, *args, session: Session = None):
+    """
+    Exécute une fonction d'import dans la session fournie, ou à défaut dans sa propre session
+    (une connexion du pool par thread), et la valide ; annule et relance l'exception en cas d'erreur.
+    """
+    own_session = session is None
+    if own_session:
+        session = database_setup.get_session()
+    try:
+        result = import_func(session, *args)
+        session.commit()
+        return result
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        if own_session:
+            session.close()
+
+
+def import_metadata_to_db(session: Session = None):
     """
     Orchestre l'importation de la structure académique (Institutions, Composantes, Domaines, 
     Mentions, Parcours) dans le bon ordre.
+    Les étapes indépendantes d'un même niveau de dépendance s'exécutent en parallèle,
+    chacune dans sa propre session ; les étapes séquentielles réutilisent la session fournie.
     """
     print(f"\n--- 2. Démarrage de l'importation des métadonnées ---")
-    session = database_setup.get_session()
 
     try:
-        # 1. Importation des Institutions (étape critique)
-        if not _import_institutions(session):
-            return
+        with ThreadPoolExecutor(max_workers=METADATA_WORKERS) as executor:
+            # 1. Institutions (étape critique) || chargement et nettoyage du DF de métadonnées
+            future_institutions = executor.submit(_run_in_session, _import_institutions)
+            future_metadata = executor.submit(_load_and_clean_metadata)
+            if not future_institutions.result():
+                return
+            df_metadata = future_metadata.result()
+            if df_metadata is None:
+                return
+
+            # 2. Composantes (dépend d'Institution) || Domaines (aucune dépendance)
+            futures = [
+                executor.submit(_run_in_session, _import_composantes, df_metadata),
+                executor.submit(_run_in_session, _import_domaines, df_metadata)
+            ]
+            for future in futures:
+                future.result()
+
+        # 3. Mentions puis Parcours (chaîne de dépendances, donc séquentiels) : une seule transaction
+        _run_in_session(_import_mentions_and_parcours, df_metadata, session=session)
 
-        # 2. Chargement et nettoyage du DF de métadonnées
-        df_metadata = _load_and_clean_metadata()
-        if df_metadata is None:
-            return
-
-        # 3. Importation ordonnée des entités restantes
-        _import_composantes(session, df_metadata) # Dépend d'Institution
-        _import_domaines(session, df_metadata)
-        
-        df_mentions_source = _import_mentions(session, df_metadata) # Dépend de Composante/Domaine
-
-        _import_parcours(session, df_metadata, df_mentions_source) # Dépend de Mention
-
-        session.commit()
         print("\n✅ Importation des métadonnées académiques (Composante, etc.) terminée avec succès.")
 
     except Exception as e:
-        session.rollback()
         print(f"\n❌ ERREUR D'IMPORTATION (Métadonnées): {e}", file=sys.stderr)
-    finally:
-        session.close()
 
 
 # ----------------------------------------------------------------------
 # FONCTIONS D'IMPORTATION UNITAIRE DES INSCRIPTIONS
 # ----------------------------------------------------------------------
 
-def _load_and_clean_inscriptions():
-    """Charge et nettoie le fichier d'inscriptions."""
+def _excel_cell(valeur):
+    """Normalise une cellule brute (calamine/openpyxl) comme le ferait pd.read_excel (vide -> None, 12.0 -> 12)."""
+    if valeur == '':
+        return None
+    if isinstance(valeur, float) and valeur.is_integer():
+        return int(valeur)
+    return valeur
+
+
+def _clean_inscriptions(df: pd.DataFrame) -> pd.DataFrame:
+    """Nettoie un bloc du fichier d'inscriptions (dates, renommage, colonnes texte)."""
+    # Conversion des colonnes de dates au format Python Date
+    date_cols = ['naissance_date', 'cin_date']
+    for col in date_cols:
+        df[col] = pd.to_datetime(df[col], errors='coerce', dayfirst=True).dt.date
+    
+    # Année du bac en entier nullable (valeurs non numériques -> NA), une fois pour toute la colonne
+    if 'bacc_annee' in df.columns:
+        df['bacc_annee'] = pd.to_numeric(df['bacc_annee'], errors='coerce').astype('Int64')
+    
+    # NaN/NaT -> None uniquement à la frontière psycopg2 (_iter_rows, COPY) : pas de copie complète du DF ici
+    
+    # --- Renommage critique pour la jointure/FK (fait ici pour que 'id_parcours' soit la colonne de travail) ---
+    if 'id_parcours_caractere' in df.columns:
+        df.rename(columns={'id_parcours_caractere': 'id_parcours'}, inplace=True) 
+    
+    # Nettoyage de toutes les colonnes texte (dont la clé étrangère du parcours)
+    clean_str_cols(df, [
+        c.name for model in (Etudiant, Inscription)
+        for c in model.__table__.columns if isinstance(c.type, String)
+    ])
+    return df
+
+
+def _iter_excel_rows(path: str):
+    """
+    Itère sur les lignes brutes (tuples de valeurs) de la première feuille, sans charger le fichier.
+    Avec config.EXCEL_ENGINE = 'calamine' et python-calamine installé : itérateur calamine ;
+    sinon : openpyxl en lecture seule (read_only=True), même feuille, même flux ligne à ligne.
+    """
+    if config.EXCEL_ENGINE == 'calamine':
+        try:
+            from python_calamine import CalamineWorkbook
+        except ImportError:
+            print("⚠️ python-calamine indisponible : lecture des inscriptions avec openpyxl.", file=sys.stderr)
+        else:
+            yield from CalamineWorkbook.from_path(path).get_sheet_by_index(0).iter_rows()
+            return
+    
+    import openpyxl
+    classeur = openpyxl.load_workbook(path, read_only=True, data_only=True)
     try:
-        df = pd.read_excel(config.INSCRIPTION_FILE_PATH)
-        df.columns = df.columns.str.lower().str.replace(' ', '_')
-        
-        # Conversion des colonnes de dates au format Python Date
-        date_cols = ['naissance_date', 'cin_date']
-        for col in date_cols:
-            df[col] = pd.to_datetime(df[col], errors='coerce', dayfirst=True).dt.date
-            
-        df = df.where(pd.notnull(df), None) 
-        print(f"Fichier XLSX d'inscriptions chargé. {len(df)} lignes trouvées.")
-        
-        # --- Renommage critique pour la jointure/FK (fait ici pour que 'id_parcours' soit la colonne de travail) ---
-        if 'id_parcours_caractere' in df.columns:
-            df.rename(columns={'id_parcours_caractere': 'id_parcours'}, inplace=True) 
-        
-        # Nettoyage de la clé étrangère du parcours
-        if 'id_parcours' in df.columns:
-             df['id_parcours'] = df['id_parcours'].astype(str).apply(safe_string) 
+        yield from classeur.worksheets[0].iter_rows(values_only=True)
+    finally:
+        # En lecture seule, openpyxl garde le fichier ouvert jusqu'à close()
+        classeur.close()
 
-        return df
-        
-    except Exception as e:
-        print(f"❌ ERREUR: Impossible de lire le fichier XLSX d'inscriptions. {e}", file=sys.stderr)
-        return None
+
+def _build_inscription_chunk(lignes, entetes: list, debut: int) -> pd.DataFrame:
+    """Construit et nettoie le DataFrame d'un bloc à partir de ses lignes brutes."""
+    bloc = [[_excel_cell(v) for v in ligne] for ligne in lignes]
+    # dtype=object : pas d'inférence par bloc (une cellule vide passerait une clé 1000 en 1000.0)
+    df = pd.DataFrame(bloc, columns=entetes, index=range(debut, debut + len(bloc)), dtype=object)
+    del bloc
+    return _clean_inscriptions(df)
+
+
+def _iter_inscription_chunks(chunksize: int = INSCRIPTION_CHUNK_SIZE):
+    """Lit le fichier d'inscriptions en flux et produit des DataFrames nettoyés de 'chunksize' lignes,
+    indexés par leur ligne dans le fichier."""
+    lignes = _iter_excel_rows(config.INSCRIPTION_FILE_PATH)
+    entetes = [_normalize_header(c) for c in next(lignes)]
+    
+    debut = 0
+    # 'premiere' ouvre chaque bloc : seule cette ligne brute reste référencée pendant la pause du yield
+    for premiere in lignes:
+        yield _build_inscription_chunk(chain([premiere], islice(lignes, chunksize - 1)), entetes, debut)
+        debut += chunksize
 
 
 def _import_annees_universitaires(session: Session, df: pd.DataFrame):
     """Importe les Années Universitaires."""
     print("\n--- Importation des Années Universitaires ---")
-    annees = df['annee_universitaire'].drop_duplicates().dropna()
-    for annee in tqdm(annees, desc="Années Univ."):
-        session.merge(AnneeUniversitaire(annee=safe_string(annee)))
+    annees = df['annee_universitaire'].dropna().drop_duplicates().tolist()
+    if annees:
+        # Une seule requête multi-lignes ; les années déjà présentes sont ignorées
+        session.execute(
+            pg_insert(AnneeUniversitaire.__table__)
+            .values([{'annee': annee} for annee in annees])
+            .on_conflict_do_nothing(index_elements=['annee'])
+        )
     session.commit()
-    print("✅ Années Universitaires insérées/mises à jour.")
+    print(f"✅ Années Universitaires insérées ({len(annees)} dans le fichier).")
 
 
-def _import_etudiants(session: Session, df: pd.DataFrame):
-    """Importe les Étudiants avec gestion d'erreurs (commit par ligne)."""
-    print("\n--- Importation des Étudiants (Ligne par Ligne FORCÉE) ---")
-    df_etudiants = df.drop_duplicates(subset=['code_etudiant']).dropna(subset=['code_etudiant'])
+def _copy_etudiants(session: Session, df_etudiants: pd.DataFrame) -> int:
+    """
+    Charge les Étudiants en bloc par COPY FROM STDIN.
+    Premier chargement (table vide) : COPY directement dans 'etudiants'.
+    Sinon : COPY dans une table temporaire, puis un seul INSERT ... SELECT ... ON CONFLICT DO UPDATE.
+    Retourne le nombre de lignes transmises.
+    """
+    colonnes = [c.name for c in Etudiant.__table__.columns]
+    df_copy = df_etudiants.reindex(columns=colonnes)
+    
+    buf = io.StringIO()
+    df_copy.to_csv(buf, index=False, header=False)
+    buf.seek(0)
+    
+    liste_colonnes = ", ".join(colonnes)
+    maj_colonnes = ", ".join(f"{c} = EXCLUDED.{c}" for c in colonnes if c != 'code_etudiant')
+    
+    # Import rejouable (upsert) : inutile d'attendre le flush du WAL à chaque commit de bloc
+    session.execute(text("SET LOCAL synchronous_commit = off"))
+    cursor = session.connection().connection.cursor()
+    
+    # Table vide : aucun conflit possible (codes déjà dédoublonnés), pas besoin de passer par la table temporaire
+    if _table_is_empty(session, Etudiant):
+        cursor.copy_expert(f"COPY etudiants ({liste_colonnes}) FROM STDIN WITH (FORMAT csv)", buf)
+        return len(df_copy)
+    
+    # La table temporaire disparaît au commit de la transaction
+    session.execute(text("CREATE TEMP TABLE staging_etudiants (LIKE etudiants INCLUDING DEFAULTS) ON COMMIT DROP"))
+    cursor.copy_expert(f"COPY staging_etudiants ({liste_colonnes}) FROM STDIN WITH (FORMAT csv)", buf)
+    session.execute(text(
+        f"INSERT INTO etudiants ({liste_colonnes}) SELECT {liste_colonnes} FROM staging_etudiants "
+        f"ON CONFLICT (code_etudiant) DO UPDATE SET {maj_colonnes}"
+    ))
+    return len(df_copy)
+
+
+def _import_etudiants(session: Session, df: pd.DataFrame, deja_importes: set = None):
+    """
+    Importe les Étudiants en bloc (COPY + ON CONFLICT).
+    Les valeurs trop longues pour leur VARCHAR sont écartées avant l'envoi ; si le chargement
+    en bloc échoue malgré tout, bascule sur des lots de COMMIT_BATCH_SIZE lignes (INSERT ... ON CONFLICT),
+    et seul un lot en échec est repris ligne par ligne pour isoler et journaliser la ligne fautive.
+    deja_importes (codes vus dans les blocs précédents) conserve la première occurrence de chaque étudiant.
+    """
+    print("\n--- Importation des Étudiants (COPY en bloc) ---")
+    df_etudiants = df[_unique_rows_mask(df['code_etudiant'])]
+    if deja_importes is not None:
+        df_etudiants = df_etudiants[~df_etudiants['code_etudiant'].isin(deja_importes)]
+    
+    # Pré-contrôle des longueurs VARCHAR : le serveur ne voit jamais les lignes à tronquer
+    df_etudiants, etudiant_errors = _reject_too_long(df_etudiants, Etudiant, 'code_etudiant', 'ETUDIANT')
+    if deja_importes is not None:
+        # Une ligne écartée n'est pas retenue : une occurrence valide dans un bloc suivant pourra être importée
+        deja_importes.update(df_etudiants['code_etudiant'])
+    
+    try:
+        nombre = _copy_etudiants(session, df_etudiants)
+        session.commit()
+        print(f"\n✅ Insertion des étudiants terminée. {nombre} ligne(s) chargée(s), {etudiant_errors} erreur(s) individuelle(s) détectée(s).")
+        return
+    except Exception as e:
+        session.rollback()
+        print(f"⚠️ Chargement en bloc des étudiants impossible ({e}). Bascule sur l'import par lots.", file=sys.stderr)
+    
+    etudiant_errors = _upsert_in_batches(
+        session, Etudiant, df_etudiants, ['code_etudiant'], _merge_etudiants_row_by_row, etudiant_errors, "Lots Etudiants"
+    )
+    print(f"\n✅ Insertion des étudiants terminée. {etudiant_errors} erreur(s) individuelle(s) détectée(s).")
+
+
+def _merge_etudiants_row_by_row(session: Session, df_etudiants: pd.DataFrame) -> int:
+    """
+    Importe les Étudiants ligne par ligne (chemin de diagnostic).
+    Chaque ligne est isolée dans un SAVEPOINT (une ligne en erreur n'annule qu'elle-même),
+    le commit réel n'a lieu que tous les COMMIT_BATCH_SIZE lignes.
+    Retourne le nombre de lignes en erreur.
+    """
     etudiant_errors = 0
     
-    for index, row in tqdm(df_etudiants.iterrows(), total=len(df_etudiants), desc="Import Etudiants"):
-        code_etudiant = row.get('code_etudiant', 'N/A')
+    colonnes = [c.name for c in Etudiant.__table__.columns]
+    lignes = _iter_rows(df_etudiants, colonnes)
+    
+    for count, (index, champs) in enumerate(tqdm(lignes, total=len(df_etudiants), desc="Import Etudiants"), start=1):
+        code_etudiant = champs['code_etudiant']
         
         try:
-            naissance_date_val = row['naissance_date'] if isinstance(row['naissance_date'], date) else None
-            cin_date_val = row['cin_date'] if isinstance(row['cin_date'], date) else None
-            
-            session.merge(Etudiant(
-                code_etudiant=safe_string(code_etudiant), 
-                numero_inscription=safe_string(row.get('numero_inscription')),
-                nom=safe_string(row['nom']), 
-                prenoms=safe_string(row['prenoms']),
-                sexe=safe_string(row['sexe']), 
-                naissance_date=naissance_date_val, 
-                naissance_lieu=safe_string(row.get('naissance_lieu')),
-                nationalite=safe_string(row.get('nationalite')),
-                bacc_annee=int(row['bacc_annee']) if pd.notna(row['bacc_annee']) and row['bacc_annee'] is not None else None,
-                bacc_serie=safe_string(row.get('bacc_serie')), 
-                bacc_centre=safe_string(row.get('bacc_centre')),
-                adresse=safe_string(row.get('adresse')), 
-                telephone=safe_string(row.get('telephone')), 
-                mail=safe_string(row.get('mail')),
-                cin=safe_string(row.get('cin')), 
-                cin_date=cin_date_val, 
-                cin_lieu=safe_string(row.get('cin_lieu'))
-            ))
-            
-            session.commit()
+            # Dates et bacc_annee sont déjà typées par _clean_inscriptions (NaT/NA -> None via _iter_rows)
+            with session.begin_nested():
+                session.merge(Etudiant(**champs))
             
         except Exception as e:
-            session.rollback()
+            # Le SAVEPOINT a déjà été annulé : la transaction du lot reste valide
             etudiant_errors += 1
-            e_msg = str(e.orig).lower() if hasattr(e, 'orig') and e.orig else str(e)
-            
-            # Gestion d'erreurs (inchangée)
-            if "stringdatarighttruncation" in e_msg:
-                 col_suspecte = "Taille de VARCHAR inconnue"
-                 if "varying(50)" in e_msg: col_suspecte = "VARCHAR(50) - (bacc_serie)"
-                 elif "varying(100)" in e_msg: col_suspecte = "VARCHAR(100) - (cin ou lieu)"
-                 elif "varying(20)" in e_msg: col_suspecte = "VARCHAR(20) - (sexe)"
-                 print(f"❌ [ETUDIANT] Ligne Excel {row.name} ({code_etudiant}) - ERREUR: Valeur trop longue (TRONCATION sur {col_suspecte})")
-                 logging.error(f"ETUDIANT: {code_etudiant} | ERREUR TRONCATION sur {col_suspecte} | Détail: {e_msg} | LIGNE_EXCEL_IDX: {row.name}")
-            else:
-                 print(f"❌ [ETUDIANT] Ligne Excel {row.name} ({code_etudiant}) - ERREUR: {e_msg}")
-                 logging.error(f"ETUDIANT: {code_etudiant} | Erreur: {e_msg} | LIGNE_EXCEL_IDX: {row.name}")
-             
-    print(f"\n✅ Insertion des étudiants terminée. {etudiant_errors} erreur(s) individuelle(s) détectée(s).")
+            # (les troncations VARCHAR sont déjà écartées en amont par _reject_too_long)
+            e_msg = str(e.orig) if hasattr(e, 'orig') and e.orig else str(e)
+            print(f"❌ [ETUDIANT] Ligne Excel {index} ({code_etudiant}) - ERREUR: {e_msg}")
+            logging.error(f"ETUDIANT: {code_etudiant} | Erreur: {e_msg} | LIGNE_EXCEL_IDX: {index}")
+        
+        if count % COMMIT_BATCH_SIZE == 0:
+            session.commit()
+    
+    session.commit()
+    return etudiant_errors
 
 
-def _import_inscriptions(session: Session, df: pd.DataFrame):
-    """Importe les Inscriptions avec gestion d'erreurs (commit par lot)."""
+def _import_inscriptions(session: Session, df: pd.DataFrame) -> Counter:
+    """
+    Importe les Inscriptions en une requête (INSERT ... ON CONFLICT DO UPDATE).
+    Les lignes aux clés étrangères inconnues, aux valeurs trop longues ou en double sur la contrainte
+    unique sont écartées en amont ; si l'insertion en bloc échoue malgré tout (ex: conflit unique avec
+    une inscription déjà en base), bascule sur des lots de COMMIT_BATCH_SIZE lignes, et seul un lot
+    en échec est repris ligne par ligne.
+    Retourne le décompte des erreurs par catégorie ('fk', 'uq', 'data', 'other').
+    """
     print("\n--- Importation des Inscriptions ---")
     
     cles_requises = ['code_inscription', 'code_etudiant', 'annee_universitaire', 'id_parcours', 'niveau']
     df_inscriptions = df.dropna(subset=cles_requises)
     
+    # Les valeurs trop longues sont comptées comme erreurs de format, sans aller-retour serveur
+    df_inscriptions, errors_data = _reject_too_long(df_inscriptions, Inscription, 'code_inscription', 'INSCRIPTION')
+    
+    # Contrôle vectorisé des clés étrangères : une requête par table référencée, puis isin()
+    fk_valides = pd.Series(True, index=df_inscriptions.index)
+    for col, colonne_ref in [
+        ('code_etudiant', Etudiant.code_etudiant),
+        ('annee_universitaire', AnneeUniversitaire.annee),
+        ('id_parcours', Parcours.id_parcours)
+    ]:
+        existants = _existing_keys(session, colonne_ref, df_inscriptions[col].unique())
+        inconnues = ~df_inscriptions[col].isin(existants)
+        if inconnues.any():
+            # Journalisation en bloc : une seule entrée (tableau CSV) par clé étrangère
+            rejets = df_inscriptions.loc[inconnues, ['code_inscription', col]]
+            logging.error(
+                f"INSCRIPTION (Intégrité): {len(rejets)} ligne(s) avec clé étrangère inconnue sur {col}\n"
+                + rejets.to_csv(sep=';', index_label='LIGNE_EXCEL_IDX')
+            )
+        fk_valides &= ~inconnues
+    errors_fk = int((~fk_valides).sum())
+    
+    # Dernière occurrence gagnante, comme le faisaient les merge() successifs
+    df_inscriptions = df_inscriptions[fk_valides]
+    df_inscriptions = df_inscriptions[_unique_rows_mask(df_inscriptions['code_inscription'], keep='last')]
+    
+    # Contrôle vectorisé de la contrainte uq_etudiant_annee_parcours_niveau à l'intérieur du bloc
+    cles_uq = ['code_etudiant', 'annee_universitaire', 'id_parcours', 'niveau']
+    doublons_uq = df_inscriptions.duplicated(subset=cles_uq, keep='last')
+    if doublons_uq.any():
+        rejets = df_inscriptions.loc[doublons_uq, ['code_inscription'] + cles_uq]
+        logging.error(
+            f"INSCRIPTION (Intégrité): {len(rejets)} ligne(s) en double sur la contrainte unique (étudiant, année, parcours, niveau)\n"
+            + rejets.to_csv(sep=';', index_label='LIGNE_EXCEL_IDX')
+        )
+    errors_uq = int(doublons_uq.sum())
+    df_inscriptions = df_inscriptions[~doublons_uq]
+    erreurs = Counter(fk=errors_fk, uq=errors_uq, data=errors_data)
+    colonnes = [c.name for c in Inscription.__table__.columns]
+    
+    try:
+        # Contrôle des clés étrangères reporté au commit : une seule passe pour tout le bloc
+        session.execute(text("SET CONSTRAINTS ALL DEFERRED"))
+        session.execute(text("SET LOCAL synchronous_commit = off"))
+        _bulk_upsert(session, Inscription, _to_records(df_inscriptions.reindex(columns=colonnes)), ['code_inscription'])
+        session.commit()
+        print(f"{len(df_inscriptions)} inscription(s) insérée(s)/mise(s) à jour.")
+        return erreurs
+    except (IntegrityError, DataError) as e:
+        session.rollback()
+        print(f"⚠️ Insertion en bloc des inscriptions impossible ({e.orig}). Bascule sur l'import par lots.", file=sys.stderr)
+    
+    return _upsert_in_batches(
+        session, Inscription, df_inscriptions, ['code_inscription'], _merge_inscriptions_row_by_row, erreurs, "Lots Inscriptions"
+    )
+
+
+def _merge_inscriptions_row_by_row(session: Session, df_inscriptions: pd.DataFrame) -> Counter:
+    """
+    Importe les Inscriptions ligne par ligne (chemin de diagnostic).
+    Chaque ligne est isolée dans un SAVEPOINT, commit tous les COMMIT_BATCH_SIZE lignes.
+    Retourne le décompte des erreurs par catégorie ('fk', 'uq', 'data', 'other').
+    """
     errors_fk, errors_uq, errors_data, errors_other = 0, 0, 0, 0
     
-    for index, row in tqdm(df_inscriptions.iterrows(), total=len(df_inscriptions), desc="Import Inscriptions"):
-        code_inscription = row.get('code_inscription', 'N/A')
+    colonnes = [c.name for c in Inscription.__table__.columns]
+    lignes = _iter_rows(df_inscriptions, colonnes)
+    
+    for count, (index, champs) in enumerate(tqdm(lignes, total=len(df_inscriptions), desc="Import Inscriptions"), start=1):
+        code_inscription = champs['code_inscription']
         
         try:
-            session.merge(Inscription(
-                code_inscription=safe_string(code_inscription), 
-                code_etudiant=safe_string(row['code_etudiant']), 
-                annee_universitaire=safe_string(row['annee_universitaire']), 
-                id_parcours=row['id_parcours'], 
-                niveau=safe_string(row['niveau']), 
-                formation=safe_string(row.get('formation'))
-            ))
-            
-            if (index + 1) % 500 == 0:
-                session.commit()
+            # Le SAVEPOINT isole la ligne : une erreur n'invalide plus tout le lot en cours
+            with session.begin_nested():
+                session.merge(Inscription(**champs))
                 
-        # Gestion des erreurs (inchangée, mais dans une fonction dédiée)
+        # Gestion des erreurs (le SAVEPOINT est déjà annulé à ce stade)
         except IntegrityError as e:
-            session.rollback()
             e_msg = str(e.orig).lower()
             if "violates foreign key constraint" in e_msg: errors_fk += 1
             elif "violates unique constraint" in e_msg: errors_uq += 1
             else: errors_other += 1
             
-            logging.error(f"INSCRIPTION (Intégrité): {code_inscription} | Détail: {e.orig} | LIGNE_EXCEL_IDX: {row.name}")
+            logging.error(f"INSCRIPTION (Intégrité): {code_inscription} | Détail: {e.orig} | LIGNE_EXCEL_IDX: {index}")
         except DataError as e:
-            session.rollback()
             errors_data += 1
-            logging.error(f"INSCRIPTION (Données): {code_inscription} | Détail: {e.orig} | LIGNE_EXCEL_IDX: {row.name}")
+            logging.error(f"INSCRIPTION (Données): {code_inscription} | Détail: {e.orig} | LIGNE_EXCEL_IDX: {index}")
         except Exception as e:
-            session.rollback()
             errors_other += 1
-            logging.error(f"INSCRIPTION (Autre): {code_inscription} | Erreur: {e} | LIGNE_EXCEL_IDX: {row.name}")
+            logging.error(f"INSCRIPTION (Autre): {code_inscription} | Erreur: {e} | LIGNE_EXCEL_IDX: {index}")
+        
+        if count % COMMIT_BATCH_SIZE == 0:
+            session.commit()
     
-    # Commit final et affichage du récapitulatif
+    # Commit final du bloc
     try:
         session.commit()
-        print("\n✅ Importation des inscriptions terminée.")
-        print(f"\n--- Récapitulatif des erreurs d'insertion ---")
-        print(f"Erreurs Clé Étrangère (FK): {errors_fk}")
-        print(f"Erreurs Contrainte Unique (UQ): {errors_uq}")
-        print(f"Erreurs Format de Données: {errors_data}")
-        print(f"Autres erreurs: {errors_other}")
-        print(f"Voir 'import_errors.log' pour les détails complets.")
     except Exception as e:
         session.rollback()
         print(f"\n❌ ERREUR CRITIQUE PENDANT LE COMMIT FINAL: {e}", file=sys.stderr)
+    
+    return Counter(fk=errors_fk, uq=errors_uq, data=errors_data, other=errors_other)
+
+
+def _print_inscriptions_summary(erreurs: Counter):
+    """Affiche le récapitulatif des erreurs d'insertion des inscriptions."""
+    print("\n✅ Importation des inscriptions terminée.")
+    print(f"\n--- Récapitulatif des erreurs d'insertion ---")
+    print(f"Erreurs Clé Étrangère (FK): {erreurs['fk']}")
+    print(f"Erreurs Contrainte Unique (UQ): {erreurs['uq']}")
+    print(f"Erreurs Format de Données: {erreurs['data']}")
+    print(f"Autres erreurs: {erreurs['other']}")
+    print(f"Voir 'import_errors.log' pour les détails complets.")
 
 
 # ----------------------------------------------------------------------
 # FONCTION ORCHESTRATRICE DES INSCRIPTIONS
 # ----------------------------------------------------------------------
 
-def import_inscriptions_to_db():
+def import_inscriptions_to_db(session: Session = None):
     """
     Orchestre l'importation des données des étudiants et des inscriptions.
+    Le fichier est traité par blocs de INSCRIPTION_CHUNK_SIZE lignes : chaque bloc
+    est entièrement importé (années, étudiants, inscriptions) puis libéré.
+    Si aucune session n'est fournie, une session dédiée est ouverte puis fermée.
     """
     print(f"\n--- 3. Démarrage de l'importation des inscriptions et étudiants ---")
     
-    df_inscriptions = _load_and_clean_inscriptions()
-    if df_inscriptions is None:
-        return
-        
-    session = database_setup.get_session()
+    own_session = session is None
+    if own_session:
+        session = database_setup.get_session()
+    etudiants_importes = set()
+    erreurs = Counter()
     
     try:
-        # 1. Années Universitaires (prérequis pour Inscription)
-        _import_annees_universitaires(session, df_inscriptions)
+        for df_bloc in _iter_inscription_chunks():
+            print(f"\n=== Bloc d'inscriptions : lignes {df_bloc.index[0]} à {df_bloc.index[-1]} ===")
+            
+            # 1. Années Universitaires (prérequis pour Inscription)
+            _import_annees_universitaires(session, df_bloc)
 
-        # 2. Étudiants
-        _import_etudiants(session, df_inscriptions)
+            # 2. Étudiants
+            _import_etudiants(session, df_bloc, etudiants_importes)
 
-        # 3. Inscriptions (dépend de Etudiant, AnneeUniversitaire, Parcours)
-        _import_inscriptions(session, df_inscriptions)
+            # 3. Inscriptions (dépend de Etudiant, AnneeUniversitaire, Parcours)
+            erreurs += _import_inscriptions(session, df_bloc)
+            
+            # Sans ce del, la variable de boucle garderait le bloc vivant pendant la construction du suivant
+            del df_bloc
+        
+        _print_inscriptions_summary(erreurs)
 
+    except Exception as e:
+        session.rollback()
+        print(f"\n❌ ERREUR D'IMPORTATION (Inscriptions): {e}", file=sys.stderr)
     finally:
-        session.close()
+        if own_session:
+            session.close()
 
 
 # ----------------------------------------------------------------------
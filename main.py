@@ -17,10 +17,15 @@ if __name__ == "__main__":
     # 1. Initialisation de la BDD et des tables
     database_setup.init_db()
     
-    # 2. Importation des données de métadonnées
-    import_data.import_metadata_to_db()
-    
-    # 3. Importation des données d'inscription
-    import_data.import_inscriptions_to_db()
+    # Une seule session (connexion déjà établie) partagée par les deux phases d'import
+    session = database_setup.get_session()
+    try:
+        # 2. Importation des données de métadonnées
+        import_data.import_metadata_to_db(session)
+        
+        # 3. Importation des données d'inscription
+        import_data.import_inscriptions_to_db(session)
+    finally:
+        session.close()
     
     print("\nProcessus d'initialisation et d'importation terminé.")
\ No newline at end of file
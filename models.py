@@ -2,7 +2,7 @@
 
 from sqlalchemy import (
     Column, Integer, String, Date, ForeignKey, 
-    UniqueConstraint, Text 
+    UniqueConstraint, Index, Text 
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -155,15 +155,16 @@ class Inscription(Base):
     
     code_inscription = Column(String(50), primary_key=True)
     
-    # Clés étrangères
-    code_etudiant = Column(String(50), ForeignKey('etudiants.code_etudiant'))
-    annee_universitaire = Column(String(9), ForeignKey('annees_universitaires.annee'))
-    id_parcours = Column(String(50), ForeignKey('parcours.id_parcours'))
+    # Clés étrangères (DEFERRABLE : vérifiables au commit lors des chargements en bloc)
+    code_etudiant = Column(String(50), ForeignKey('etudiants.code_etudiant', deferrable=True, initially='IMMEDIATE'))
+    annee_universitaire = Column(String(9), ForeignKey('annees_universitaires.annee', deferrable=True, initially='IMMEDIATE'))
+    id_parcours = Column(String(50), ForeignKey('parcours.id_parcours', deferrable=True, initially='IMMEDIATE'))
     
     niveau = Column(String(20))
     formation = Column(String(20), nullable=True)
     
     # Contrainte d'unicité pour les inscriptions
+    # (son index commence par code_etudiant : il sert aussi aux recherches par étudiant)
     __table_args__ = (
         UniqueConstraint(
             'code_etudiant', 
@@ -172,4 +173,6 @@ class Inscription(Base):
             'niveau',  
             name='uq_etudiant_annee_parcours_niveau' 
         ),
+        # Index de la clé étrangère vers parcours (non couverte par le préfixe de l'index unique)
+        Index('ix_inscr_parc', 'id_parcours'),
     )
\ No newline at end of file